@@ -1,18 +1,27 @@
 # app.py (PostgreSQL / SQLAlchemy version)
 import os
 import io
-import json
+import functools
+import hashlib
 import random
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, date, timedelta
 
 from flask import (
     Flask, render_template, request, redirect, url_for, session,
-    flash, jsonify, send_file
+    flash, jsonify, send_file, send_from_directory, g
 )
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 
-from pydub import AudioSegment
 import speech_recognition as sr
 
 # Optional PDF generation for certificates
@@ -24,17 +33,43 @@ try:
 except Exception:
     REPORTLAB_AVAILABLE = False
 
+try:
+    import fcntl  # POSIX only; serializes init_database() across workers
+except ImportError:
+    fcntl = None
+
 try:
     from gtts import gTTS
 except Exception:
     gTTS = None
 
+# Optional C-accelerated JSON encoder for API responses
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+# Optional response compression (brotli when the client accepts it, else gzip)
+try:
+    from flask_compress import Compress
+except Exception:
+    Compress = None
+
+# Optional local speech-to-text (faster-whisper / CTranslate2, int8 on CPU)
+try:
+    from faster_whisper import WhisperModel
+except Exception:
+    WhisperModel = None
+
 # Gemini AI helpers (kept as-is)
-from gemini import analyze_sentiment, analyze_communication_practice
+from gemini import Sentiment, analyze_sentiment, analyze_communication_practice
 
 # Flask + SQLAlchemy
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import func, and_, or_, text
+from sqlalchemy import func, and_, or_, text, select, update, literal, union_all, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert, JSONB
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only
 
 # -------------------------
 # App and config
@@ -42,13 +77,38 @@ from sqlalchemy import func, and_, or_, text
 app = Flask(__name__)
 app.secret_key = os.environ.get('SESSION_SECRET', 'shakespeare-club-secret-key')
 
-# Optional: Configure FFmpeg/FFprobe for pydub on Windows via env vars
-FFMPEG_BIN = os.environ.get('FFMPEG_BIN')
-FFPROBE_BIN = os.environ.get('FFPROBE_BIN')
-if FFMPEG_BIN:
-    AudioSegment.converter = FFMPEG_BIN
-if FFPROBE_BIN:
-    AudioSegment.ffprobe = FFPROBE_BIN
+class ORJSONProvider(DefaultJSONProvider):
+    """jsonify()/request.get_json() backed by orjson; falls back to Flask's
+    default hook for types orjson does not handle natively (e.g. Decimal)."""
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SORT_KEYS if self.sort_keys else 0
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+
+if Compress is not None:
+    # HTML/JSON/CSS/JS only (Flask-Compress default mimetypes); audio is already compressed
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_BR_LEVEL'] = 5
+    Compress(app)
+
+# Optional: point at a specific FFmpeg binary (e.g. on Windows) via env var
+FFMPEG_BIN = os.environ.get('FFMPEG_BIN', 'ffmpeg')
+
+# Shared speech recognizer: record()/recognize_google() keep no per-call state.
+# A fixed energy threshold skips dynamic ambient-noise recalibration.
+RECOGNIZER = sr.Recognizer()
+RECOGNIZER.dynamic_energy_threshold = False
+
+# Local Whisper model name (tiny.en / base.en / small.en ...), loaded lazily per process
+WHISPER_MODEL_NAME = os.environ.get('WHISPER_MODEL', 'base.en')
+_whisper_model = None
+_whisper_failed = False  # a failed load (e.g. model download) is not retried per request
+_whisper_lock = threading.Lock()
 
 # Database config: use DATABASE_URL env var from Render
 # Example (Render): postgres://<user>:<pw>@<host>:5432/bardspeak-db
@@ -72,7 +132,7 @@ class User(db.Model):
     total_points = db.Column(db.Integer, default=0)
     current_streak = db.Column(db.Integer, default=0)
     best_streak = db.Column(db.Integer, default=0)
-    badges = db.Column(db.Text, default='[]')
+    badges = db.Column(JSONB, default=list)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Admin(db.Model):
@@ -103,12 +163,25 @@ class DailyQuote(db.Model):
     is_featured = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # lazy='raise': callers must eager-load the poster, never fetch it per quote
+    posted_by_user = db.relationship('User', lazy='raise')
+
+    __table_args__ = (
+        # featured lookup: post_date = today AND is_featured, earliest first
+        db.Index('ix_dq_date_featured', 'post_date', 'created_at', postgresql_where=(is_featured == True)),
+        # per-department listing and first-in-department count
+        db.Index('ix_dq_date_dept', 'post_date', 'department', 'created_at'),
+        # one quote per user per day; also answers the "posted today?" probe
+        db.Index('ix_dq_posted_date', 'posted_by', 'post_date', unique=True),
+    )
+
 class ListeningContent(db.Model):
     __tablename__ = 'listening_content'
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(300), nullable=False)
     audio_file = db.Column(db.String(500), nullable=False)
     transcript = db.Column(db.Text, nullable=False)
+    transcript_tokens = db.Column(db.Text)  # token_string(transcript), set on every write
     robot_character = db.Column(db.String(50), default='boy')
     created_by = db.Column(db.Integer, db.ForeignKey('admins.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -120,6 +193,7 @@ class ObservationContent(db.Model):
     video_url = db.Column(db.String(500), nullable=False)
     questions = db.Column(db.Text, nullable=False)
     correct_answers = db.Column(db.Text, nullable=False)
+    correct_keywords = db.Column(JSONB)  # answer_keywords(correct_answers), set on every write
     created_by = db.Column(db.Integer, db.ForeignKey('admins.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -144,6 +218,12 @@ class Task(db.Model):
     module_type = db.Column(db.String(100), nullable=True)
     content_id = db.Column(db.Integer, nullable=True)
 
+    __table_args__ = (
+        # dashboard feed: active tasks for a department, ordered as in dashboard()
+        db.Index('ix_task_active_dept', 'department', due_date.asc().nullslast(), created_at.desc(),
+                 postgresql_where=(is_active == True)),
+    )
+
 class UserCompletion(db.Model):
     __tablename__ = 'user_completions'
     id = db.Column(db.Integer, primary_key=True)
@@ -153,6 +233,16 @@ class UserCompletion(db.Model):
     score = db.Column(db.Integer, nullable=False)
     points_earned = db.Column(db.Integer, nullable=False)
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    ai_pending = db.Column(db.Boolean, default=False)  # Gemini refinement still queued
+    detailed_feedback = db.Column(db.Text)
+
+    __table_args__ = (
+        # one completion per practice item; content_id 0 marks daily quote posts, which repeat
+        db.Index('uq_completion', 'user_id', 'module_type', 'content_id', unique=True,
+                 postgresql_where=(content_id != 0)),
+        # admin dashboard: today's activity count and the recent-activity feed
+        db.Index('ix_uc_completed_at', 'completed_at'),
+    )
 
 class UserStreak(db.Model):
     __tablename__ = 'user_streaks'
@@ -162,6 +252,10 @@ class UserStreak(db.Model):
     modules_completed = db.Column(db.Integer, default=0)
     points_earned = db.Column(db.Integer, default=0)
 
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'streak_date', name='uq_user_streak_date'),
+    )
+
 class SpeakingAttempt(db.Model):
     __tablename__ = 'speaking_attempts'
     id = db.Column(db.Integer, primary_key=True)
@@ -169,20 +263,138 @@ class SpeakingAttempt(db.Model):
     bio_id = db.Column(db.Integer, db.ForeignKey('biographies.id'), nullable=False)
     attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_sa_user_bio_time', 'user_id', 'bio_id', 'attempt_at'),
+    )
+
+class AIResult(db.Model):
+    __tablename__ = 'ai_results'
+    text_hash = db.Column(db.String(32), primary_key=True)  # ai_cache_key(practice_type, text)
+    practice_type = db.Column(db.String(50), nullable=False)
+    rating = db.Column(db.Integer, nullable=False)
+    confidence = db.Column(db.Float, nullable=False)
+    feedback_text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SchemaVersion(db.Model):
+    __tablename__ = 'schema_version'
+    version = db.Column(db.Integer, primary_key=True)
+
+class SpeakingJob(db.Model):
+    __tablename__ = 'speaking_jobs'
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    bio_id = db.Column(db.Integer, db.ForeignKey('biographies.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending / done / error
+    status_code = db.Column(db.Integer)
+    result = db.Column(JSONB)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Rows written before the unique indexes existed may collide with them. Submit handlers
+# rely on uq_completion / uq_user_streak_date for duplicate detection, so collisions are
+# removed (keeping the lowest id) instead of leaving the index missing.
+DEDUPE_STATEMENTS = [
+    """DELETE FROM user_completions a USING user_completions b
+       WHERE a.content_id <> 0 AND a.user_id = b.user_id AND a.module_type = b.module_type
+         AND a.content_id = b.content_id AND a.id > b.id""",
+    # a day's duplicate streak rows are folded into the kept row before deletion
+    """UPDATE user_streaks s SET modules_completed = d.modules_completed, points_earned = d.points_earned
+       FROM (SELECT MIN(id) AS keep_id, SUM(modules_completed) AS modules_completed,
+                    SUM(points_earned) AS points_earned
+             FROM user_streaks GROUP BY user_id, streak_date HAVING COUNT(*) > 1) d
+       WHERE s.id = d.keep_id""",
+    """DELETE FROM user_streaks a USING user_streaks b
+       WHERE a.user_id = b.user_id AND a.streak_date = b.streak_date AND a.id > b.id""",
+    # ix_dq_posted_date: one quote per user per day
+    """DELETE FROM daily_quotes a USING daily_quotes b
+       WHERE a.posted_by = b.posted_by AND a.post_date = b.post_date AND a.id > b.id""",
+]
+
+def ensure_indexes():
+    """create_all() skips tables that already exist, so indexes added to the models
+    later never reach an existing database. Create any that are missing; a failure
+    aborts startup rather than running without the indexes duplicate checks rely on."""
+    with db.engine.begin() as conn:
+        for statement in DEDUPE_STATEMENTS:
+            conn.execute(text(statement))
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    # uq_user_streak_date is a table constraint; a unique index serves ON CONFLICT just as well
+    with db.engine.begin() as conn:
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_user_streak_date "
+                          "ON user_streaks (user_id, streak_date)"))
+
+# create_all() never alters existing tables: columns added to existing models are
+# listed here. Every statement is idempotent, so a partly migrated database is fine.
+SCHEMA_MIGRATIONS = [
+    "ALTER TABLE listening_content ADD COLUMN IF NOT EXISTS transcript_tokens TEXT",
+    "ALTER TABLE observation_content ADD COLUMN IF NOT EXISTS correct_keywords JSONB",
+    "ALTER TABLE user_completions ADD COLUMN IF NOT EXISTS ai_pending BOOLEAN DEFAULT FALSE",
+    "ALTER TABLE user_completions ADD COLUMN IF NOT EXISTS detailed_feedback TEXT",
+]
+
+def migrate_schema():
+    """Bring tables created by an older release up to the current models."""
+    with db.engine.begin() as conn:
+        for statement in SCHEMA_MIGRATIONS:
+            conn.execute(text(statement))
+        # users.badges used to be a json.dumps() string in a TEXT column
+        badges = next(col for col in inspect(conn).get_columns('users') if col['name'] == 'badges')
+        if not isinstance(badges['type'], JSONB):
+            conn.execute(text("ALTER TABLE users ALTER COLUMN badges DROP DEFAULT"))
+            conn.execute(text("ALTER TABLE users ALTER COLUMN badges TYPE jsonb "
+                              "USING COALESCE(NULLIF(badges, ''), '[]')::jsonb"))
+
+SCHEMA_VERSION = 2  # bump whenever models gain tables, columns or indexes
+INIT_LOCK_PATH = os.path.join(tempfile.gettempdir(), 'bardspeak_init.lock')
+
+def init_database():
+    """create_all + migrate_schema + ensure_indexes + ensure_sample_data, run whenever the
+    database records an older (or no) SCHEMA_VERSION and skipped once it matches.
+    Workers starting together take an flock, so one initializes and the rest find
+    the version already written (one SELECT each)."""
+    with open(INIT_LOCK_PATH, 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        if inspect(db.engine).has_table(SchemaVersion.__tablename__):
+            current = db.session.execute(select(func.max(SchemaVersion.version))).scalar()
+            db.session.commit()
+            if current == SCHEMA_VERSION:
+                return
+        db.create_all()
+        migrate_schema()
+        ensure_indexes()
+        ensure_sample_data()
+        db.session.execute(SchemaVersion.__table__.delete())
+        db.session.add(SchemaVersion(version=SCHEMA_VERSION))
+        db.session.commit()
+
 # -------------------------
 # One-time sample data initializer (mirrors previous init_db())
 # -------------------------
+SAMPLE_DATA_LOCK_KEY = 4242  # pg advisory lock id for the one-time seed
+_sample_data_ready = False
+
 def ensure_sample_data():
     """Create default admin and sample content if not present.
        This will run on first app start (db.create_all() will be called first).
+       Concurrent workers serialize on a transaction-scoped advisory lock, so only
+       the first one seeds; later calls in the same process return immediately.
     """
+    global _sample_data_ready
+    if _sample_data_ready:
+        return
+    db.session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': SAMPLE_DATA_LOCK_KEY})
+
     # default admin
     admin = Admin.query.filter_by(username='admin').first()
     if not admin:
         admin = Admin(username='admin', password_hash=generate_password_hash('admin123'))
         db.session.add(admin)
-        db.session.commit()
+        db.session.flush()
 
+        # sample content is inserted with one executemany per table (no per-row ORM bookkeeping)
         # sample biographies
         sample_biographies = [
             ("MS Dhoni - The Captain Cool", "Mahendra Singh Dhoni",
@@ -192,9 +404,10 @@ def ensure_sample_data():
              "Dr. Avul Pakir Jainulabdeen Abdul Kalam, known as the Missile Man of India, was born on October 15, 1931, in Rameswaram, Tamil Nadu. From humble beginnings selling newspapers to becoming India's 11th President, Dr. Kalam's journey is truly inspiring. He played a pivotal role in India's space and missile programs, leading projects like Agni and Prithvi missiles. His vision for India as a developed nation by 2020 motivated millions. Dr. Kalam was not just a scientist but also a teacher who loved interacting with students. His simplicity, dedication to education, and unwavering belief in the power of dreams made him the People's President.",
              "Scientist")
         ]
-        for title, name, content, profession in sample_biographies:
-            bio = Biography(title=title, person_name=name, content=content, profession=profession, created_by=admin.id)
-            db.session.add(bio)
+        db.session.execute(Biography.__table__.insert(), [
+            {'title': title, 'person_name': name, 'content': content, 'profession': profession, 'created_by': admin.id}
+            for title, name, content, profession in sample_biographies
+        ])
 
         # sample listening content
         sample_listening = [
@@ -205,10 +418,12 @@ def ensure_sample_data():
              "Good morning, dear students! Every day is a new opportunity to learn something amazing. Remember, communication is not just about speaking - it's about connecting with others, sharing ideas, and building relationships. Practice makes perfect, so keep working on your skills. You are capable of achieving great things!",
              "girl")
         ]
-        for title, audio_file, transcript, robot_character in sample_listening:
-            item = ListeningContent(title=title, audio_file=audio_file, transcript=transcript,
-                                    robot_character=robot_character, created_by=admin.id)
-            db.session.add(item)
+        db.session.execute(ListeningContent.__table__.insert(), [
+            {'title': title, 'audio_file': audio_file, 'transcript': transcript,
+             'transcript_tokens': token_string(transcript),
+             'robot_character': robot_character, 'created_by': admin.id}
+            for title, audio_file, transcript, robot_character in sample_listening
+        ])
 
         # sample observation content
         sample_observation = [
@@ -219,10 +434,12 @@ def ensure_sample_data():
              "According to the video, what makes effective communication? Name two important elements.",
              "Active listening, Clear expression")
         ]
-        for title, video_url, questions, answers in sample_observation:
-            item = ObservationContent(title=title, video_url=video_url,
-                                      questions=questions, correct_answers=answers, created_by=admin.id)
-            db.session.add(item)
+        db.session.execute(ObservationContent.__table__.insert(), [
+            {'title': title, 'video_url': video_url, 'questions': questions,
+             'correct_answers': answers, 'correct_keywords': answer_keywords(answers),
+             'created_by': admin.id}
+            for title, video_url, questions, answers in sample_observation
+        ])
 
         # sample writing topics
         sample_topics = [
@@ -230,54 +447,384 @@ def ensure_sample_data():
             ("The Importance of Communication", "Explain why good communication skills are essential in today's world."),
             ("A Person Who Inspires Me", "Describe someone who motivates you and explain why they are your inspiration.")
         ]
-        for topic, description in sample_topics:
-            t = WritingTopic(topic=topic, description=description, created_by=admin.id)
-            db.session.add(t)
+        db.session.execute(WritingTopic.__table__.insert(), [
+            {'topic': topic, 'description': description, 'created_by': admin.id}
+            for topic, description in sample_topics
+        ])
 
-        db.session.commit()
+    # single commit: writes the seed (if any) and releases the advisory lock
+    db.session.commit()
+    _sample_data_ready = True
 
 # -------------------------
 # Helper functions (converted to ORM)
 # -------------------------
-def calculate_badge_progress(user_id):
-    """Calculate badges for a user and update user's badges field."""
-    user = User.query.get(user_id)
-    if not user:
-        return []
+# Words are runs of letters, digits and apostrophes, so trailing punctuation never sticks to a token
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+def tokenize(text):
+    """Lower-case text and split it into words in a single regex pass."""
+    return _TOKEN_RE.findall(text.lower())
+
+def token_string(text):
+    """Sorted unique tokens, space-joined; stored so submissions only need .split()."""
+    return ' '.join(sorted(set(tokenize(text))))
+
+@functools.lru_cache(maxsize=256)
+def bio_word_set(content):
+    """Lower-cased word set of a biography script, cached by its text."""
+    return frozenset(tokenize(content))
+
+@functools.lru_cache(maxsize=256)
+def transcript_word_set(transcript_tokens):
+    """Word set of a listening transcript from its stored token string, cached so
+    repeat submissions against the same item reuse one frozenset."""
+    return frozenset(transcript_tokens.split())
+
+def answer_keywords(correct_answers):
+    """Comma-separated expected answers as token lists ("Hard work, Focus" ->
+    [['hard', 'work'], ['focus']]); stored in ObservationContent.correct_keywords."""
+    return [tokens for tokens in map(tokenize, correct_answers.split(',')) if tokens]
+
+def keyword_match_ratio(keywords, text):
+    """Fraction of keywords whose tokens all appear in text (set lookups, no substring scans)."""
+    if not keywords:
+        return 0
+    user_tokens = set(tokenize(text))
+    matched = sum(1 for tokens in keywords if all(t in user_tokens for t in tokens))
+    return matched / len(keywords)
+
+@functools.lru_cache(maxsize=256)
+def script_token_count(content):
+    return len(tokenize(content))
+
+def script_match_percent(content, text):
+    """Deterministic speaking score: spoken words (repeats included) found in the script,
+    over the script's word count. Membership is checked against the cached word set;
+    scanning the token list made this O(spoken x script)."""
+    script_words = bio_word_set(content)
+    matching_words = sum(1 for word in tokenize(text) if word in script_words)
+    return matching_words / max(script_token_count(content), 1) * 100
+
+def word_overlap_percent(original_words, text):
+    """Percentage of original_words that also appear in text."""
+    # intersection() accepts the token list directly, so no second set is built
+    matched = original_words.intersection(tokenize(text))
+    return len(matched) / max(len(original_words), 1) * 100
+
+def streak_values(user_id, points_earned):
+    """Upsert today's UserStreak row. Returns the users SET values that roll the
+    current/best streak forward, or {} when the user was already active today."""
+    today = date.today()
+    streaks = UserStreak.__table__
+    last_active = select(func.max(streaks.c.streak_date)).where(
+        streaks.c.user_id == user_id, streaks.c.streak_date < today
+    ).scalar_subquery()
+    stmt = pg_insert(streaks).values(
+        user_id=user_id, streak_date=today, modules_completed=1, points_earned=points_earned
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'streak_date'],
+        set_={
+            'modules_completed': streaks.c.modules_completed + 1,
+            'points_earned': streaks.c.points_earned + stmt.excluded.points_earned,
+        }
+    ).returning(streaks.c.modules_completed, last_active)
+    modules_completed, last_date = db.session.execute(stmt).one()
+    if modules_completed != 1:
+        return {}
+
+    # first module today: extend the streak only if the previous active day was yesterday
+    if last_date == today - timedelta(days=1):
+        new_streak = func.coalesce(User.current_streak, 0) + 1
+    else:
+        new_streak = 1
+    # SQL-side SET expressions both read the pre-update row, so best_streak
+    # is compared against the new streak value, not the stale one
+    return {'current_streak': new_streak,
+            'best_streak': func.greatest(func.coalesce(User.best_streak, 0), new_streak)}
+
+def award_progress(user, points_earned, count_streak=True):
+    """Credit a completion: points and (for streak modules) today's streak go out as one
+    atomic users UPDATE, and its RETURNING row feeds the badge check. The caller commits.
+    Returns (total_points, current_streak, best_streak) after the update."""
+    values = {'total_points': func.coalesce(User.total_points, 0) + points_earned}
+    if count_streak:
+        values.update(streak_values(user.id, points_earned))
+    row = db.session.execute(
+        update(User).where(User.id == user.id).values(**values)
+        .returning(User.total_points, User.current_streak, User.best_streak)
+        .execution_options(synchronize_session=False)
+    ).one()
+    award_new_badges(user, row.total_points, row.best_streak)
+    return row
+
+# Gemini calls are network-bound; the detailed feedback runs alongside the sentiment call
+_AI_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+def ai_cache_key(practice_type, text):
+    """AIResult key: case and whitespace do not change what Gemini is asked to judge."""
+    normalized = ' '.join(text.lower().split())
+    return hashlib.blake2b(f"{practice_type}|{normalized}".encode(), digest_size=16).hexdigest()
+
+def store_ai_result(text_hash, practice_type, sentiment_result, feedback_future):
+    """Done-callback for the feedback Future: cache both analyses once feedback succeeded."""
+    if feedback_future.exception() is not None:
+        return
+    feedback = feedback_future.result()
+    if feedback.startswith('Error in communication analysis'):
+        return  # analyze_communication_practice reports failures as text
+    with app.app_context():
+        db.session.execute(pg_insert(AIResult.__table__).values(
+            text_hash=text_hash, practice_type=practice_type, rating=sentiment_result.rating,
+            confidence=sentiment_result.confidence, feedback_text=feedback
+        ).on_conflict_do_nothing())
+        db.session.commit()
+
+def run_ai_analysis(text, practice_type):
+    """Start both Gemini analyses concurrently and wait only for the sentiment rating.
+    The detailed feedback is returned as a Future for the caller to collect.
+    Identical answers (see ai_cache_key) are served from AIResult without calling Gemini."""
+    text_hash = ai_cache_key(practice_type, text)
+    cached = db.session.get(AIResult, text_hash)
+    if cached is not None:
+        feedback_future = Future()
+        feedback_future.set_result(cached.feedback_text)
+        return Sentiment(rating=cached.rating, confidence=cached.confidence), feedback_future
+
+    feedback_future = _AI_EXECUTOR.submit(analyze_communication_practice, text, practice_type)
+    sentiment_result = analyze_sentiment(text)
+    feedback_future.add_done_callback(
+        functools.partial(store_ai_result, text_hash, practice_type, sentiment_result))
+    return sentiment_result, feedback_future
+
+def _with_completion_query(model, module_type):
+    # correlated EXISTS rather than an outer join: duplicate completion rows
+    # cannot multiply the content rows
+    completed = select(UserCompletion.id).where(
+        UserCompletion.content_id == model.id,
+        UserCompletion.user_id == session['user_id'],
+        UserCompletion.module_type == module_type
+    ).exists()
+    return db.session.query(model, completed)
+
+def items_with_completion(model, module_type, *columns):
+    """(item, completed) pairs for a module index page in one query,
+    loading only the columns the cards render."""
+    return _with_completion_query(model, module_type).options(
+        load_only(*columns)).order_by(model.created_at.desc()).all()
+
+def item_with_completion(model, module_type, item_id):
+    """(item, completed) for one practice page, or None if the item does not exist;
+    the already-completed check rides along with the content fetch."""
+    return _with_completion_query(model, module_type).filter(model.id == item_id).first()
+
+# Submit handlers answer with the deterministic score; Gemini then refines score,
+# points and feedback here. Separate pool: refine_completion waits on _AI_EXECUTOR.
+_AI_REFINE_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+def rescore_speaking(bio_content, text, rating):
+    similarity = word_overlap_percent(bio_word_set(bio_content), text)
+    points_earned = 10
+    if similarity >= 80 and rating >= 4:
+        points_earned = 15
+    elif similarity >= 60 or rating >= 3:
+        points_earned = 12
+    return int(min(100, similarity + rating * 10)), points_earned
+
+def rescore_listening(original_words, text, rating):
+    accuracy = min(100, (word_overlap_percent(original_words, text) + rating * 15) / 2)
+    return int(accuracy), 10 if accuracy >= 80 else 8
+
+def rescore_observation(base_accuracy, rating):
+    accuracy = min(100, base_accuracy + rating * 5)
+    return int(accuracy), 10 if accuracy >= 90 else 8
+
+def rescore_writing(word_count, rating):
+    depth_score = min(100, word_count * 1.5)
+    final_score = (depth_score + rating * 20) / 2
+    points_earned = 10
+    if word_count >= 100 and rating >= 4:
+        points_earned = 15
+    elif word_count >= 75 or rating >= 3:
+        points_earned = 12
+    return int(final_score), points_earned
+
+def refine_completion(completion_id, user_id, text, practice_type, rescore, streak_date=None):
+    """Background: run Gemini for a committed completion, store its feedback and apply
+    the AI score. rescore(rating) -> (score, points_earned); any point difference is
+    added to the user's total and, when given, that day's streak row."""
+    with app.app_context():
+        pending = True
+        try:
+            completion = db.session.get(UserCompletion, completion_id)
+            try:
+                sentiment_result, feedback_future = run_ai_analysis(text, practice_type)
+                score, points_earned = rescore(sentiment_result.rating)
+                feedback = feedback_future.result()
+            except Exception as e:
+                # keep the deterministic score
+                db.session.rollback()
+                completion.detailed_feedback = f"Analysis completed with basic scoring. AI unavailable: {str(e)}"
+            else:
+                delta = points_earned - completion.points_earned
+                completion.score = score
+                completion.points_earned = points_earned
+                completion.detailed_feedback = feedback
+                if delta:
+                    user = db.session.get(User, user_id)
+                    award_progress(user, delta, count_streak=False)
+                    if streak_date is not None:
+                        db.session.execute(UserStreak.__table__.update().where(
+                            UserStreak.user_id == user_id, UserStreak.streak_date == streak_date
+                        ).values(points_earned=UserStreak.points_earned + delta))
+            completion.ai_pending = False
+            db.session.commit()
+            pending = False
+        except Exception:
+            app.logger.exception('Refining completion %s failed', completion_id)
+            db.session.rollback()
+        finally:
+            if pending:
+                # never leave the completion pending, or its feedback endpoint answers 202 forever
+                db.session.execute(UserCompletion.__table__.update().where(
+                    UserCompletion.id == completion_id, UserCompletion.ai_pending.is_(True)
+                ).values(ai_pending=False))
+                db.session.commit()
+
+REQUIRED_MODULES = {'speaking', 'listening', 'writing', 'observation'}
+
+def get_module_counts(user_id):
+    """Completion counts per module_type for a user (single GROUP BY query)."""
+    rows = db.session.query(UserCompletion.module_type, func.count(UserCompletion.id)).\
+        filter_by(user_id=user_id).group_by(UserCompletion.module_type).all()
+    return {module_type: count for module_type, count in rows}
 
-    completions = UserCompletion.query.filter_by(user_id=user_id).all()
+def compute_badges(total_points, best_streak, completion_count):
+    """Badges earned for the given points, best streak and completion count (no writes)."""
     badges = []
-    if user.total_points >= 100:
+    if (total_points or 0) >= 100:
         badges.append("Century Scorer")
-    if user.best_streak >= 7:
+    if (best_streak or 0) >= 7:
         badges.append("Week Warrior")
-    if user.best_streak >= 30:
+    if (best_streak or 0) >= 30:
         badges.append("Monthly Master")
-    if len(completions) >= 10:
+    if completion_count >= 10:
         badges.append("Practice Champion")
-    if len(completions) >= 50:
+    if completion_count >= 50:
         badges.append("Communication Expert")
+    return badges
 
-    user.badges = json.dumps(badges)
-    db.session.commit()
+def award_new_badges(user, total_points, best_streak):
+    """Refresh the stored badges from the post-update points and best streak;
+    the calling submit handler commits."""
+    with db.session.no_autoflush:
+        completion_count = UserCompletion.query.filter_by(user_id=user.id).count()
+    badges = compute_badges(total_points, best_streak, completion_count)
+    if user.badges != badges:
+        user.badges = badges
     return badges
 
-def is_certificate_ready(user_id):
-    """Eligibility: at least one completion in each module"""
-    rows = db.session.query(UserCompletion.module_type, func.count(UserCompletion.id)).\
-        filter(
-            UserCompletion.user_id == user_id,
-            UserCompletion.module_type.in_(['speaking','listening','writing','observation'])
-        ).group_by(UserCompletion.module_type).all()
-    have = {r[0] for r in rows if r[1] > 0}
-    required = {'speaking','listening','writing','observation'}
-    return required.issubset(have)
+def is_certificate_ready(user, module_counts=None):
+    """Eligibility: at least one completion in each module.
+    Completions are never removed, so once reached the result is remembered in
+    the session (keyed by user id) and later checks skip the database."""
+    if session.get('cert_ready') == user.id:
+        return True
+    if module_counts is None:
+        module_counts = get_module_counts(user.id)
+    have = {module_type for module_type, count in module_counts.items() if count > 0}
+    ready = REQUIRED_MODULES.issubset(have)
+    if ready:
+        session['cert_ready'] = user.id
+    return ready
+
+# -------------------------
+# Per-process cache for today's quotes (short TTL, cleared by submit_quote)
+# -------------------------
+QUOTE_CACHE_TTL = 60  # seconds
+_FEATURED_CACHE = {}
+_DEPT_QUOTES_CACHE = {}
+_QUOTE_CACHE_LOCK = threading.Lock()
+
+def _quote_to_dict(quote):
+    """Detach a DailyQuote (with posted_by_user loaded) into a plain dict the templates can read."""
+    return {
+        'id': quote.id,
+        'quote': quote.quote,
+        'author': quote.author,
+        'posted_by': quote.posted_by,
+        'department': quote.department,
+        'post_date': quote.post_date,
+        'is_featured': quote.is_featured,
+        'created_at': quote.created_at,
+        'username': quote.posted_by_user.username,
+    }
+
+def _cached(cache, key, loader):
+    now = time.monotonic()
+    with _QUOTE_CACHE_LOCK:
+        entry = cache.get(key)
+        if entry and now - entry[0] < QUOTE_CACHE_TTL:
+            return entry[1]
+    value = loader()
+    with _QUOTE_CACHE_LOCK:
+        cache[key] = (now, value)
+    return value
+
+def get_featured_quote_cached(today):
+    """Today's featured quote as (quote_dict, user_dict), or (None, None)."""
+    def load():
+        quote = DailyQuote.query.options(joinedload(DailyQuote.posted_by_user)).\
+            filter(DailyQuote.post_date == today, DailyQuote.is_featured == True).\
+            order_by(DailyQuote.created_at.asc()).first()
+        if not quote:
+            return None, None
+        user = quote.posted_by_user
+        user_dict = {'id': user.id, 'username': user.username, 'department': user.department}
+        return _quote_to_dict(quote), user_dict
+    return _cached(_FEATURED_CACHE, today, load)
+
+def get_department_quotes_cached(today):
+    """All quotes posted today, ordered by department then posting time."""
+    def load():
+        quotes = DailyQuote.query.options(joinedload(DailyQuote.posted_by_user)).\
+            filter_by(post_date=today).order_by(DailyQuote.department, DailyQuote.created_at.asc()).all()
+        return [_quote_to_dict(quote) for quote in quotes]
+    return _cached(_DEPT_QUOTES_CACHE, today, load)
+
+def invalidate_quote_cache(today):
+    with _QUOTE_CACHE_LOCK:
+        _FEATURED_CACHE.pop(today, None)
+        _DEPT_QUOTES_CACHE.pop(today, None)
+
+def get_task_content_options():
+    """Task-link dropdown entries for every module in one UNION ALL query, newest first.
+    Rows expose .id, .name (biographies only) and .title."""
+    options = union_all(
+        select(literal('speaking').label('kind'), Biography.id, Biography.person_name.label('name'),
+               Biography.title.label('title'), Biography.created_at),
+        select(literal('listening'), ListeningContent.id, literal(''), ListeningContent.title,
+               ListeningContent.created_at),
+        select(literal('observation'), ObservationContent.id, literal(''), ObservationContent.title,
+               ObservationContent.created_at),
+        select(literal('writing'), WritingTopic.id, literal(''), WritingTopic.topic,
+               WritingTopic.created_at),
+    )
+    options = options.order_by(options.selected_columns.created_at.desc())
+    grouped = {'speaking': [], 'listening': [], 'observation': [], 'writing': []}
+    for row in db.session.execute(options):
+        grouped[row.kind].append(row)
+    return grouped
 
 # -------------------------
 # Upload / static config
 # -------------------------
 UPLOAD_DIR = os.path.join('static', 'audio')
 ALLOWED_AUDIO_EXTS = {'.mp3', '.wav', '.ogg', '.m4a', '.webm'}
+UPLOAD_MAX_AGE = 365 * 24 * 3600  # seconds; see uploaded_audio
+
+UPLOAD_BUFFER_SIZE = 1 << 20  # 1 MiB writes for audio saves
 
 def ensure_upload_dir():
     try:
@@ -285,9 +832,171 @@ def ensure_upload_dir():
     except Exception:
         pass
 
+# once per process, so upload handlers go straight to open()
+ensure_upload_dir()
+
+def save_upload(stream, path):
+    """Copy an uploaded stream to path in UPLOAD_BUFFER_SIZE chunks.
+    (No sendfile: fileno() on werkzeug's SpooledTemporaryFile forces small uploads to disk.)"""
+    stream.seek(0)
+    with open(path, 'wb') as dst:
+        shutil.copyfileobj(stream, dst, UPLOAD_BUFFER_SIZE)
+
+def transcode_to_wav(src_stream):
+    """Decode a recording to 16 kHz mono 16-bit WAV in a single ffmpeg pass.
+    ffmpeg resamples, downmixes and encodes together, so the full-rate
+    stereo decode never lands in Python memory. src_stream must be a real,
+    unbuffered file: ffmpeg reads it directly as its stdin from the current offset."""
+    result = subprocess.run(
+        [FFMPEG_BIN, '-hide_banner', '-loglevel', 'error', '-i', 'pipe:0',
+         '-ar', '16000', '-ac', '1', '-acodec', 'pcm_s16le', '-f', 'wav', 'pipe:1'],
+        stdin=src_stream, capture_output=True, timeout=60
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode(errors='replace').strip() or 'ffmpeg failed')
+    return io.BytesIO(result.stdout)
+
+def get_whisper_model():
+    """Load the local Whisper model once per process; the first caller pays the load.
+    Returns None when faster-whisper is missing or the model cannot be loaded."""
+    global _whisper_model, _whisper_failed
+    if WhisperModel is None or _whisper_failed:
+        return None
+    if _whisper_model is None:
+        with _whisper_lock:
+            if _whisper_model is None and not _whisper_failed:
+                try:
+                    _whisper_model = WhisperModel(WHISPER_MODEL_NAME, device='cpu', compute_type='int8')
+                except Exception as e:
+                    app.logger.warning('Could not load Whisper model %s, using Google Web Speech: %s',
+                                       WHISPER_MODEL_NAME, e)
+                    _whisper_failed = True
+    return _whisper_model
+
+def transcribe_audio(wav_buf):
+    """Speech-to-text: local faster-whisper when it loads, else Google Web Speech."""
+    whisper_model = get_whisper_model()
+    if whisper_model is not None:
+        # greedy decoding (beam_size=1) keeps latency low for short recordings
+        segments, _ = whisper_model.transcribe(wav_buf, beam_size=1)
+        return ' '.join(segment.text.strip() for segment in segments)
+    with sr.AudioFile(wav_buf) as source:
+        audio_data = RECOGNIZER.record(source)
+    return RECOGNIZER.recognize_google(audio_data)
+
+# -------------------------
+# Background speaking jobs
+# -------------------------
+# STT + Gemini take seconds per recording; running them here keeps request
+# workers free. Kept small because local Whisper is CPU bound.
+_SPEAKING_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+SPEAKING_JOB_DIR = os.path.join(tempfile.gettempdir(), 'bardspeak_jobs')
+os.makedirs(SPEAKING_JOB_DIR, exist_ok=True)
+
+def score_speaking_audio(user_id, bio_id, audio_path):
+    """Transcribe and score a saved recording. Returns (payload, http_status)."""
+    # unbuffered: the header sniff and seek(0) below move the OS file offset,
+    # which is where ffmpeg starts reading when handed the file as stdin
+    with open(audio_path, 'rb', buffering=0) as src_stream:
+        try:
+            # sniff the RIFF/WAVE header instead of trusting the filename or mimetype;
+            # only non-WAV recordings (webm/ogg from browsers) need the ffmpeg round-trip
+            header = src_stream.read(12)
+            src_stream.seek(0)
+            if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+                wav_buf = src_stream
+            else:
+                wav_buf = transcode_to_wav(src_stream)
+        except Exception as e:
+            hint = (' Ensure FFmpeg installed and available in PATH, or set the FFMPEG_BIN env var.')
+            return {'error': f'Audio processing failed: {str(e)}. {hint}'}, 400
+
+        # Transcribe
+        try:
+            recorded_text = transcribe_audio(wav_buf)
+        except Exception as e:
+            return {'error': f'Speech-to-text failed: {str(e)}'}, 400
+
+    # reuse scoring logic from submit_speaking
+    biography = Biography.query.get(bio_id)
+    if not biography:
+        return {'error': 'Biography not found'}, 404
+
+    try:
+        sentiment_result, feedback_future = run_ai_analysis(recorded_text, 'speaking')
+        similarity = word_overlap_percent(bio_word_set(biography.content), recorded_text)
+        points_earned = 10
+        if similarity >= 80 and sentiment_result.rating >= 4:
+            points_earned = 15
+        elif similarity >= 60 or sentiment_result.rating >= 3:
+            points_earned = 12
+        final_score = int(min(100, similarity + sentiment_result.rating * 10))
+        # this already runs in the background, so wait for the detailed feedback here
+        detailed_feedback = feedback_future.result()
+    except Exception as e:
+        db.session.rollback()
+        similarity = script_match_percent(biography.content, recorded_text)
+        points_earned = 10 if similarity >= 70 else 8
+        final_score = int(similarity)
+        detailed_feedback = f"Analysis completed with basic scoring. AI unavailable: {str(e)}"
+
+    # Save completion and update user
+    user = User.query.get(user_id)
+    completion = UserCompletion(user_id=user_id, module_type='speaking', content_id=bio_id,
+                                score=final_score, points_earned=points_earned,
+                                detailed_feedback=detailed_feedback)
+    db.session.add(completion)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        return {'error': 'Already completed'}, 409
+
+    # Update user points and streaks (one UPDATE)
+    award_progress(user, points_earned)
+    db.session.commit()
+
+    return {
+        'points': points_earned,
+        'similarity': similarity,
+        'celebration': similarity >= 70,
+        'transcript': recorded_text
+    }, 200
+
+def process_speaking_submission(job_id, user_id, bio_id, audio_path):
+    """Executor entry point: score the recording and store the outcome on the
+    SpeakingJob row, where /result/<job_id> picks it up."""
+    with app.app_context():
+        try:
+            payload, status_code = score_speaking_audio(user_id, bio_id, audio_path)
+        except Exception as e:
+            db.session.rollback()
+            payload, status_code = {'error': f'Processing failed: {str(e)}'}, 500
+        finally:
+            try:
+                os.remove(audio_path)
+            except OSError:
+                pass
+        job = SpeakingJob.query.get(job_id)
+        job.status = 'done' if status_code == 200 else 'error'
+        job.status_code = status_code
+        job.result = payload
+        db.session.commit()
+
 # -------------------------
 # Routes (logic preserved, DB calls converted)
 # -------------------------
+@app.before_request
+def load_current_user():
+    """Load the logged-in user once per request; routes and helpers read g.user."""
+    g.user = None
+    # file endpoints never read g.user
+    if 'user_id' in session and request.endpoint not in ('static', 'uploaded_audio'):
+        g.user = db.session.get(User, session['user_id'])
+        if g.user is None:
+            # account removed since login: drop the stale id so route guards redirect
+            session.pop('user_id', None)
+
 @app.route('/')
 def index():
     return render_template('home.html')
@@ -336,31 +1045,25 @@ def dashboard():
     if 'user_id' not in session:
         return redirect(url_for('index'))
 
-    user = User.query.get(session['user_id'])
+    user = g.user
     recent_activities = UserCompletion.query.filter_by(user_id=user.id).order_by(UserCompletion.completed_at.desc()).limit(5).all()
 
     today = date.today()
-    featured_quote = db.session.query(DailyQuote, User).join(User, DailyQuote.posted_by == User.id).\
-        filter(DailyQuote.post_date == today, DailyQuote.is_featured == True).\
-        order_by(DailyQuote.created_at.asc()).first()
-    # featured_quote may be tuple (DailyQuote, User) or None
-    if featured_quote:
-        featured_quote_obj, featured_user = featured_quote
-    else:
-        featured_quote_obj = None
-        featured_user = None
+    featured_quote_obj, featured_user = get_featured_quote_cached(today)
 
-    badges = calculate_badge_progress(session['user_id'])
+    # one aggregate feeds both the badge thresholds and certificate eligibility
+    module_counts = get_module_counts(user.id)
+    badges = compute_badges(user.total_points, user.best_streak, sum(module_counts.values()))
 
     tasks = Task.query.filter(
         Task.is_active == True,
         or_(Task.department == 'ALL', Task.department == session.get('department', 'ALL'))
     ).order_by(
-        # mimic ordering: due_date null last, then due_date asc, created_at desc
-        Task.due_date.is_(None), Task.due_date.asc(), Task.created_at.desc()
+        # due_date asc with nulls last, then created_at desc (matches ix_task_active_dept)
+        Task.due_date.asc().nullslast(), Task.created_at.desc()
     ).limit(10).all()
 
-    certificate_ready = is_certificate_ready(session['user_id'])
+    certificate_ready = is_certificate_ready(user, module_counts)
 
     return render_template(
         'dashboard.html',
@@ -377,113 +1080,74 @@ def dashboard():
 def speaking_module():
     if 'user_id' not in session:
         return redirect(url_for('index'))
-    biographies = Biography.query.order_by(Biography.created_at.desc()).all()
-    completed = db.session.query(UserCompletion.content_id).filter_by(user_id=session['user_id'], module_type='speaking').all()
-    completed_ids = [c[0] for c in completed]
-    return render_template('speaking.html', biographies=biographies, completed_ids=completed_ids)
+    biographies = items_with_completion(Biography, 'speaking', Biography.person_name,
+                                        Biography.profession, Biography.title)
+    return render_template('speaking.html', biographies=biographies)
 
 @app.route('/speaking/<int:bio_id>')
 def speaking_practice(bio_id):
     if 'user_id' not in session:
         return redirect(url_for('index'))
-    completed = UserCompletion.query.filter_by(user_id=session['user_id'], module_type='speaking', content_id=bio_id).first()
+    row = item_with_completion(Biography, 'speaking', bio_id)
+    if not row:
+        flash('Biography not found!')
+        return redirect(url_for('speaking_module'))
+    biography, completed = row
     if completed:
         flash('You have already completed this speaking practice! ✅')
         return redirect(url_for('speaking_module'))
-    biography = Biography.query.get(bio_id)
-    if not biography:
-        flash('Biography not found!')
-        return redirect(url_for('speaking_module'))
     return render_template('speaking_practice.html', biography=biography)
 
 @app.route('/submit_speaking', methods=['POST'])
 def submit_speaking():
     if 'user_id' not in session:
         return redirect(url_for('index'))
+    user = g.user
 
     bio_id = int(request.form['bio_id'])
     recorded_text = request.form.get('recorded_text', '').strip()
 
-    existing = UserCompletion.query.filter_by(user_id=session['user_id'], module_type='speaking', content_id=bio_id).first()
-    if existing:
-        flash('🚫 You have already completed this practice! Try a different one.')
-        return redirect(url_for('speaking_module'))
-
     biography = Biography.query.get(bio_id)
     if not biography:
-        flash('Biography not found!')
-        return redirect(url_for('speaking_module'))
-
-    try:
-        sentiment_result = analyze_sentiment(recorded_text)
-        detailed_feedback = analyze_communication_practice(recorded_text, 'speaking')
-
-        original_words = set(biography.content.lower().split())
-        user_words = set(recorded_text.lower().split())
-        similarity = len(original_words.intersection(user_words)) / max(len(original_words), 1) * 100
+        return jsonify({'error': 'Biography not found'}), 404
 
-        points_earned = 10
-        if similarity >= 80 and sentiment_result.rating >= 4:
-            points_earned = 15
-        elif similarity >= 60 or sentiment_result.rating >= 3:
-            points_earned = 12
-
-        final_score = int(min(100, similarity + sentiment_result.rating * 10))
-    except Exception as e:
-        # Fallback if AI fails
-        original_words = biography.content.lower().split()
-        user_words = recorded_text.lower().split()
-        matching_words = sum(1 for word in user_words if word in original_words)
-        similarity = (matching_words / len(original_words)) * 100 if original_words else 0
-        points_earned = 10 if similarity >= 70 else 8
-        final_score = int(similarity)
-        detailed_feedback = f"Analysis completed with basic scoring. AI unavailable: {str(e)}"
+    # deterministic score now; refine_completion applies the Gemini-based one
+    similarity = script_match_percent(biography.content, recorded_text)
+    points_earned = 10 if similarity >= 70 else 8
+    final_score = int(similarity)
+    rescore = functools.partial(rescore_speaking, biography.content, recorded_text)
 
     # Save completion
     completion = UserCompletion(
-        user_id=session['user_id'],
+        user_id=user.id,
         module_type='speaking',
         content_id=bio_id,
         score=final_score,
-        points_earned=points_earned
+        points_earned=points_earned,
+        ai_pending=True
     )
     db.session.add(completion)
-
-    # Update user points
-    user = User.query.get(session['user_id'])
-    user.total_points = (user.total_points or 0) + points_earned
-    db.session.commit()
-
-    # Update streaks
-    today = date.today()
-    streak = UserStreak.query.filter_by(user_id=session['user_id'], streak_date=today).first()
-    if not streak:
-        # Insert new streak record
-        streak = UserStreak(user_id=session['user_id'], streak_date=today, modules_completed=1, points_earned=points_earned)
-        db.session.add(streak)
-
-        # Update current streak: check yesterday
-        yesterday = today - timedelta(days=1)
-        yesterday_record = UserStreak.query.filter_by(user_id=session['user_id'], streak_date=yesterday).first()
-        if yesterday_record:
-            user.current_streak = (user.current_streak or 0) + 1
-        else:
-            user.current_streak = 1
-    else:
-        # increment modules_completed
-        streak.modules_completed = (streak.modules_completed or 0) + 1
-        streak.points_earned = (streak.points_earned or 0) + points_earned
-
-    # Update best_streak
-    user.best_streak = max(user.best_streak or 0, user.current_streak or 0)
-
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # uq_completion: this practice was already completed
+        db.session.rollback()
+        return jsonify({'error': '🚫 You have already completed this practice! Try a different one.'}), 409
+    completion_id = completion.id
+
+    # Update user points and streaks (one UPDATE)
+    progress = award_progress(user, points_earned)
     db.session.commit()
+    _AI_REFINE_EXECUTOR.submit(refine_completion, completion_id, session['user_id'], recorded_text,
+                               'speaking', rescore, date.today())
 
     success_data = {
         'points': points_earned,
         'similarity': similarity,
         'celebration': similarity >= 70,
-        'current_streak': user.current_streak or 1
+        'current_streak': progress.current_streak or 1,
+        'completion_id': completion_id,
+        'feedback_url': url_for('completion_feedback', completion_id=completion_id)
     }
     return jsonify(success_data)
 
@@ -491,6 +1155,7 @@ def submit_speaking():
 def submit_speaking_audio():
     if 'user_id' not in session:
         return redirect(url_for('index'))
+    user = g.user
 
     bio_id = request.form.get('bio_id')
     audio_file = request.files.get('audio')
@@ -498,117 +1163,69 @@ def submit_speaking_audio():
         return jsonify({'error': 'Missing audio or bio_id'}), 400
     bio_id = int(bio_id)
 
+    # cheap check before queueing STT + Gemini; uq_completion still guards the insert
+    already_completed = db.session.query(select(UserCompletion.id).where(
+        UserCompletion.user_id == user.id,
+        UserCompletion.module_type == 'speaking',
+        UserCompletion.content_id == bio_id
+    ).exists()).scalar()
+    if already_completed:
+        return jsonify({'error': 'Already completed'}), 409
+
     # Attempts limit: using SpeakingAttempt table
-    today = date.today()
+    # half-open range on attempt_at (not DATE(attempt_at)) so ix_sa_user_bio_time is usable
+    day_start = datetime.combine(date.today(), datetime.min.time())
     attempt_count = SpeakingAttempt.query.filter(
-        SpeakingAttempt.user_id == session['user_id'],
+        SpeakingAttempt.user_id == user.id,
         SpeakingAttempt.bio_id == bio_id,
-        func.date(SpeakingAttempt.attempt_at) == today
+        SpeakingAttempt.attempt_at >= day_start,
+        SpeakingAttempt.attempt_at < day_start + timedelta(days=1)
     ).count()
     if attempt_count >= 10:
         return jsonify({'error': 'Attempt limit reached. You have already tried 10 times today.'}), 429
 
-    # record attempt
-    attempt = SpeakingAttempt(user_id=session['user_id'], bio_id=bio_id)
+    # Heavy lifting (transcode, STT, Gemini) runs on the job executor; the client
+    # polls /result/<job_id> instead of holding this worker for the whole pipeline
+    job = SpeakingJob(id=uuid.uuid4().hex, user_id=user.id, bio_id=bio_id)
+    audio_path = os.path.join(SPEAKING_JOB_DIR, job.id)
+    save_upload(audio_file.stream, audio_path)
+
+    # record attempt alongside the job
+    attempt = SpeakingAttempt(user_id=user.id, bio_id=bio_id)
     db.session.add(attempt)
+    db.session.add(job)
     db.session.commit()
+    _SPEAKING_EXECUTOR.submit(process_speaking_submission, job.id, user.id, bio_id, audio_path)
 
-    # Process audio: try to produce WAV buffer
-    raw = audio_file.read()
-    wav_buf = None
-    try:
-        filename = (audio_file.filename or '').lower()
-        content_type = (audio_file.mimetype or '').lower()
-        src_buf = io.BytesIO(raw)
-        src_buf.seek(0)
-
-        if filename.endswith('.wav') or 'wav' in content_type:
-            wav_buf = src_buf
-        else:
-            # attempt to detect using speech_recognition
-            try:
-                with sr.AudioFile(src_buf) as _:
-                    src_buf.seek(0)
-                    wav_buf = src_buf
-            except Exception:
-                wav_buf = None
-
-        if wav_buf is None:
-            segment = AudioSegment.from_file(io.BytesIO(raw))
-            out = io.BytesIO()
-            segment.set_frame_rate(16000).set_channels(1).export(out, format='wav')
-            out.seek(0)
-            wav_buf = out
-    except Exception as e:
-        hint = (' Ensure FFmpeg installed and available in PATH, or set FFMPEG_BIN/FFPROBE_BIN env vars.')
-        return jsonify({'error': f'Audio processing failed: {str(e)}. {hint}'}), 400
-
-    # Transcribe
-    recognizer = sr.Recognizer()
-    try:
-        with sr.AudioFile(wav_buf) as source:
-            audio_data = recognizer.record(source)
-        recorded_text = recognizer.recognize_google(audio_data)
-    except Exception as e:
-        return jsonify({'error': f'Speech-to-text failed: {str(e)}'}), 400
-
-    # reuse scoring logic from submit_speaking
-    existing = UserCompletion.query.filter_by(user_id=session['user_id'], module_type='speaking', content_id=bio_id).first()
-    if existing:
-        return jsonify({'error': 'Already completed'}), 409
-
-    biography = Biography.query.get(bio_id)
-    if not biography:
-        return jsonify({'error': 'Biography not found'}), 404
-
-    try:
-        sentiment_result = analyze_sentiment(recorded_text)
-        detailed_feedback = analyze_communication_practice(recorded_text, 'speaking')
-        original_words = set(biography.content.lower().split())
-        user_words = set(recorded_text.lower().split())
-        similarity = len(original_words.intersection(user_words)) / max(len(original_words), 1) * 100
-        points_earned = 10
-        if similarity >= 80 and sentiment_result.rating >= 4:
-            points_earned = 15
-        elif similarity >= 60 or sentiment_result.rating >= 3:
-            points_earned = 12
-        final_score = int(min(100, similarity + sentiment_result.rating * 10))
-    except Exception:
-        original_words = biography.content.lower().split()
-        user_words = recorded_text.lower().split()
-        matching_words = sum(1 for word in user_words if word in original_words)
-        similarity = (matching_words / len(original_words)) * 100 if original_words else 0
-        points_earned = 10 if similarity >= 70 else 8
-        final_score = int(similarity)
-
-    # Save completion and update user
-    completion = UserCompletion(user_id=session['user_id'], module_type='speaking', content_id=bio_id,
-                                score=final_score, points_earned=points_earned)
-    db.session.add(completion)
+    status_url = url_for('speaking_result', job_id=job.id)
+    return jsonify({'job_id': job.id, 'status_url': status_url}), 202, {'Location': status_url}
 
-    user = User.query.get(session['user_id'])
-    user.total_points = (user.total_points or 0) + points_earned
-    db.session.commit()
+@app.route('/result/<job_id>')
+def speaking_result(job_id):
+    if 'user_id' not in session:
+        return redirect(url_for('index'))
 
-    # Update streaks
-    today = date.today()
-    streak = UserStreak.query.filter_by(user_id=session['user_id'], streak_date=today).first()
-    if not streak:
-        streak = UserStreak(user_id=session['user_id'], streak_date=today, modules_completed=1, points_earned=points_earned)
-        db.session.add(streak)
-        user.current_streak = (user.current_streak or 0) + 1
-    else:
-        streak.modules_completed = (streak.modules_completed or 0) + 1
-        streak.points_earned = (streak.points_earned or 0) + points_earned
+    job = SpeakingJob.query.filter_by(id=job_id, user_id=session['user_id']).first()
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status == 'pending':
+        return jsonify({'status': 'pending'}), 202
+    return jsonify(job.result), job.status_code
 
-    user.best_streak = max(user.best_streak or 0, user.current_streak or 0)
-    db.session.commit()
+@app.route('/completion/<int:completion_id>/feedback')
+def completion_feedback(completion_id):
+    if 'user_id' not in session:
+        return redirect(url_for('index'))
 
+    completion = UserCompletion.query.filter_by(id=completion_id, user_id=session['user_id']).first()
+    if not completion:
+        return jsonify({'error': 'Completion not found'}), 404
+    if completion.ai_pending:
+        return jsonify({'status': 'pending'}), 202
     return jsonify({
-        'points': points_earned,
-        'similarity': similarity,
-        'celebration': similarity >= 70,
-        'transcript': recorded_text
+        'score': completion.score,
+        'points': completion.points_earned,
+        'feedback': completion.detailed_feedback
     })
 
 @app.route('/writing')
@@ -617,8 +1234,7 @@ def writing_module():
         return redirect(url_for('index'))
 
     today = date.today()
-    department_quotes = db.session.query(DailyQuote, User).join(User, DailyQuote.posted_by == User.id).\
-        filter(DailyQuote.post_date == today).order_by(DailyQuote.department, DailyQuote.created_at.asc()).all()
+    department_quotes = get_department_quotes_cached(today)
 
     # presence check
     user_posted_today = DailyQuote.query.filter_by(posted_by=session['user_id'], post_date=today).first()
@@ -631,31 +1247,33 @@ def writing_module():
 def submit_quote():
     if 'user_id' not in session:
         return redirect(url_for('index'))
+    user = g.user
 
     quote = request.form.get('quote', '').strip()
     author = request.form.get('author', '').strip()
     today = date.today()
 
-    existing = DailyQuote.query.filter_by(posted_by=session['user_id'], post_date=today).first()
-    if existing:
-        flash('You already posted a quote today!')
-        return redirect(url_for('writing_module'))
-
-    dept_quotes_today_count = db.session.query(DailyQuote).join(User, DailyQuote.posted_by == User.id).\
-        filter(User.department == session['department'], DailyQuote.post_date == today).count()
+    dept_quotes_today_count = DailyQuote.query.filter_by(department=session['department'], post_date=today).count()
     is_first = (dept_quotes_today_count == 0)
     points_earned = 15 if is_first else 10
 
-    dq = DailyQuote(quote=quote, author=author, posted_by=session['user_id'], department=session['department'], post_date=today, is_featured=is_first)
+    dq = DailyQuote(quote=quote, author=author, posted_by=user.id, department=session['department'], post_date=today, is_featured=is_first)
     db.session.add(dq)
     # save completion (writing module)
-    completion = UserCompletion(user_id=session['user_id'], module_type='writing', content_id=0, score=100, points_earned=points_earned)
+    completion = UserCompletion(user_id=user.id, module_type='writing', content_id=0, score=100, points_earned=points_earned)
     db.session.add(completion)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # ix_dq_posted_date: this user already posted today
+        db.session.rollback()
+        flash('You already posted a quote today!')
+        return redirect(url_for('writing_module'))
 
-    user = User.query.get(session['user_id'])
-    user.total_points = (user.total_points or 0) + points_earned
+    award_progress(user, points_earned, count_streak=False)
 
     db.session.commit()
+    invalidate_quote_cache(today)
 
     if is_first:
         flash('🎉 Congratulations! You are the first from your department to post today! You earned 15 points!')
@@ -668,47 +1286,38 @@ def submit_quote():
 def submit_writing():
     if 'user_id' not in session:
         return redirect(url_for('index'))
+    user = g.user
 
     quote_id = int(request.form.get('quote_id'))
     user_response = request.form.get('user_response', '').strip()
 
-    existing = UserCompletion.query.filter_by(user_id=session['user_id'], module_type='writing', content_id=quote_id).first()
-    if existing:
-        flash('🚫 You have already completed this writing practice! Try a different quote.')
-        return redirect(url_for('writing_module'))
-
     quote = DailyQuote.query.get(quote_id)
     if not quote:
         flash('Quote not found.')
         return redirect(url_for('writing_module'))
 
-    try:
-        sentiment_result = analyze_sentiment(user_response)
-        detailed_feedback = analyze_communication_practice(user_response, 'writing')
-
-        word_count = len(user_response.split())
-        depth_score = min(100, word_count * 1.5)
-        quality_score = sentiment_result.rating * 20
-        final_score = (depth_score + quality_score) / 2
-
-        points_earned = 10
-        if word_count >= 100 and sentiment_result.rating >= 4:
-            points_earned = 15
-        elif word_count >= 75 or sentiment_result.rating >= 3:
-            points_earned = 12
-    except Exception as e:
-        word_count = len(user_response.split())
-        final_score = min(100, word_count * 2)
-        points_earned = 10 if word_count >= 50 else 8
-        detailed_feedback = f"Writing evaluated with basic scoring. AI unavailable: {str(e)}"
+    # deterministic score now; refine_completion applies the Gemini-based one
+    word_count = len(user_response.split())
+    final_score = min(100, word_count * 2)
+    points_earned = 10 if word_count >= 50 else 8
+    rescore = functools.partial(rescore_writing, word_count)
 
-    completion = UserCompletion(user_id=session['user_id'], module_type='writing', content_id=quote_id, score=int(final_score), points_earned=points_earned)
+    completion = UserCompletion(user_id=user.id, module_type='writing', content_id=quote_id, score=int(final_score),
+                                points_earned=points_earned, ai_pending=True)
     db.session.add(completion)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        flash('🚫 You have already completed this writing practice! Try a different quote.')
+        return redirect(url_for('writing_module'))
+    completion_id = completion.id
 
-    user = User.query.get(session['user_id'])
-    user.total_points = (user.total_points or 0) + points_earned
-
+    award_progress(user, points_earned, count_streak=False)
     db.session.commit()
+    # writing practice does not count towards streaks, so no streak_date
+    _AI_REFINE_EXECUTOR.submit(refine_completion, completion_id, session['user_id'], user_response,
+                               'writing', rescore)
 
     flash(f'🎉 Writing practice completed! Points earned: {points_earned} | Score: {final_score:.1f}%')
     return redirect(url_for('writing_module'))
@@ -718,26 +1327,24 @@ def listening_module():
     if 'user_id' not in session:
         return redirect(url_for('index'))
 
-    listening_items = ListeningContent.query.order_by(ListeningContent.created_at.desc()).all()
-    completed = db.session.query(UserCompletion.content_id).filter_by(user_id=session['user_id'], module_type='listening').all()
-    completed_ids = [c[0] for c in completed]
-    return render_template('listening.html', listening_items=listening_items, completed_ids=completed_ids)
+    listening_items = items_with_completion(ListeningContent, 'listening', ListeningContent.title,
+                                            ListeningContent.robot_character)
+    return render_template('listening.html', listening_items=listening_items)
 
 @app.route('/listening/<int:content_id>')
 def listening_practice(content_id):
     if 'user_id' not in session:
         return redirect(url_for('index'))
 
-    completed = UserCompletion.query.filter_by(user_id=session['user_id'], module_type='listening', content_id=content_id).first()
+    row = item_with_completion(ListeningContent, 'listening', content_id)
+    if not row:
+        flash('Content not found!')
+        return redirect(url_for('listening_module'))
+    content, completed = row
     if completed:
         flash('You have already completed this listening practice! ✅')
         return redirect(url_for('listening_module'))
 
-    content = ListeningContent.query.get(content_id)
-    if not content:
-        flash('Content not found!')
-        return redirect(url_for('listening_module'))
-
     return render_template('listening_practice.html', content=content)
 
 @app.route('/submit_listening', methods=['POST'])
@@ -748,80 +1355,64 @@ def submit_listening():
     content_id = int(request.form.get('content_id'))
     user_input = request.form.get('user_input', '').strip()
 
-    existing = UserCompletion.query.filter_by(user_id=session['user_id'], module_type='listening', content_id=content_id).first()
-    if existing:
-        flash('🚫 You have already completed this listening practice! Try a different one.')
-        return redirect(url_for('listening_module'))
-
     content = ListeningContent.query.get(content_id)
     if not content:
-        flash('Content not found.')
-        return redirect(url_for('listening_module'))
-
-    try:
-        sentiment_result = analyze_sentiment(user_input)
-        detailed_feedback = analyze_communication_practice(user_input, 'listening')
-
-        original_text = content.transcript.lower().strip()
-        user_text = user_input.lower().strip()
-        original_words = set(original_text.split())
-        user_words = set(user_text.split())
-        word_accuracy = len(original_words.intersection(user_words)) / max(len(original_words), 1) * 100
-
-        accuracy = min(100, (word_accuracy + sentiment_result.rating * 15) / 2)
-        points_earned = 10 if accuracy >= 80 else 8
-    except Exception as e:
-        original_text = content.transcript.lower().strip()
-        user_text = user_input.lower().strip()
-        accuracy = (100 if original_text == user_text else
-                    80 if len(user_text) > 0 and original_text in user_text else
-                    60 if len(user_text) > 0 else 0)
-        points_earned = 10 if accuracy >= 80 else 8
-
-    completion = UserCompletion(user_id=session['user_id'], module_type='listening', content_id=content_id, score=int(accuracy), points_earned=points_earned)
+        return jsonify({'error': 'Content not found.'}), 404
+
+    # deterministic score now; refine_completion applies the Gemini-based one
+    original_text = content.transcript.lower().strip()
+    user_text = user_input.lower().strip()
+    accuracy = (100 if original_text == user_text else
+                80 if len(user_text) > 0 and original_text in user_text else
+                60 if len(user_text) > 0 else 0)
+    points_earned = 10 if accuracy >= 80 else 8
+    # rows created before transcript_tokens existed fall back to tokenizing here
+    original_words = (transcript_word_set(content.transcript_tokens) if content.transcript_tokens
+                      else frozenset(tokenize(content.transcript)))
+    rescore = functools.partial(rescore_listening, original_words, user_input)
+
+    user = g.user
+    completion = UserCompletion(user_id=user.id, module_type='listening', content_id=content_id, score=int(accuracy),
+                                points_earned=points_earned, ai_pending=True)
     db.session.add(completion)
-
-    user = User.query.get(session['user_id'])
-    user.total_points = (user.total_points or 0) + points_earned
-
-    # update streaks similar to speaking
-    today = date.today()
-    streak = UserStreak.query.filter_by(user_id=session['user_id'], streak_date=today).first()
-    if not streak:
-        streak = UserStreak(user_id=session['user_id'], streak_date=today, modules_completed=1, points_earned=points_earned)
-        db.session.add(streak)
-        user.current_streak = (user.current_streak or 0) + 1
-    else:
-        streak.modules_completed = (streak.modules_completed or 0) + 1
-        streak.points_earned = (streak.points_earned or 0) + points_earned
-
-    user.best_streak = max(user.best_streak or 0, user.current_streak or 0)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # uq_completion: this practice was already completed
+        db.session.rollback()
+        return jsonify({'error': '🚫 You have already completed this listening practice! Try a different one.'}), 409
+    completion_id = completion.id
+
+    # points and streak, as in speaking
+    award_progress(user, points_earned)
     db.session.commit()
+    _AI_REFINE_EXECUTOR.submit(refine_completion, completion_id, session['user_id'], user_input,
+                               'listening', rescore, date.today())
 
-    success_data = {'points': points_earned, 'accuracy': accuracy, 'celebration': accuracy >= 80}
+    success_data = {'points': points_earned, 'accuracy': accuracy, 'celebration': accuracy >= 80,
+                    'completion_id': completion_id,
+                    'feedback_url': url_for('completion_feedback', completion_id=completion_id)}
     return jsonify(success_data)
 
 @app.route('/observation')
 def observation_module():
     if 'user_id' not in session:
         return redirect(url_for('index'))
-    observation_items = ObservationContent.query.order_by(ObservationContent.created_at.desc()).all()
-    completed = db.session.query(UserCompletion.content_id).filter_by(user_id=session['user_id'], module_type='observation').all()
-    completed_ids = [c[0] for c in completed]
-    return render_template('observation.html', observation_items=observation_items, completed_ids=completed_ids)
+    observation_items = items_with_completion(ObservationContent, 'observation', ObservationContent.title)
+    return render_template('observation.html', observation_items=observation_items)
 
 @app.route('/observation/<int:content_id>')
 def observation_practice(content_id):
     if 'user_id' not in session:
         return redirect(url_for('index'))
-    completed = UserCompletion.query.filter_by(user_id=session['user_id'], module_type='observation', content_id=content_id).first()
+    row = item_with_completion(ObservationContent, 'observation', content_id)
+    if not row:
+        flash('Content not found!')
+        return redirect(url_for('observation_module'))
+    content, completed = row
     if completed:
         flash('You have already completed this observation practice! ✅')
         return redirect(url_for('observation_module'))
-    content = ObservationContent.query.get(content_id)
-    if not content:
-        flash('Content not found!')
-        return redirect(url_for('observation_module'))
     return render_template('observation_practice.html', content=content)
 
 @app.route('/submit_observation', methods=['POST'])
@@ -831,54 +1422,40 @@ def submit_observation():
     content_id = int(request.form.get('content_id'))
     user_answer = request.form.get('user_answer', '').strip()
 
-    existing = UserCompletion.query.filter_by(user_id=session['user_id'], module_type='observation', content_id=content_id).first()
-    if existing:
-        flash('🚫 You have already completed this observation practice! Try a different video.')
-        return redirect(url_for('observation_module'))
-
     content = ObservationContent.query.get(content_id)
     if not content:
-        flash('Content not found.')
-        return redirect(url_for('observation_module'))
-
-    try:
-        sentiment_result = analyze_sentiment(user_answer)
-        detailed_feedback = analyze_communication_practice(user_answer, 'observation')
-
-        correct_answers = content.correct_answers.lower()
-        user_answer_lower = user_answer.lower()
-        base_accuracy = 100 if correct_answers in user_answer_lower else 70
-        quality_boost = sentiment_result.rating * 5
-        accuracy = min(100, base_accuracy + quality_boost)
-        points_earned = 10 if accuracy >= 90 else 8
-    except Exception:
-        correct_answers = content.correct_answers.lower()
-        user_answer_lower = user_answer.lower()
-        accuracy = 100 if correct_answers in user_answer_lower else 70
-        points_earned = 10 if accuracy == 100 else 8
+        return jsonify({'error': 'Content not found.'}), 404
 
-    completion = UserCompletion(user_id=session['user_id'], module_type='observation', content_id=content_id,
-                                score=int(accuracy), points_earned=points_earned)
-    db.session.add(completion)
+    # 70 with no expected keyword present, 100 with all of them
+    keywords = content.correct_keywords or answer_keywords(content.correct_answers)
+    base_accuracy = 70 + 30 * keyword_match_ratio(keywords, user_answer)
 
-    user = User.query.get(session['user_id'])
-    user.total_points = (user.total_points or 0) + points_earned
+    # deterministic score now; refine_completion adds the Gemini quality boost
+    accuracy = base_accuracy
+    points_earned = 10 if accuracy == 100 else 8
+    rescore = functools.partial(rescore_observation, base_accuracy)
 
-    # update streaks
-    today = date.today()
-    streak = UserStreak.query.filter_by(user_id=session['user_id'], streak_date=today).first()
-    if not streak:
-        streak = UserStreak(user_id=session['user_id'], streak_date=today, modules_completed=1, points_earned=points_earned)
-        db.session.add(streak)
-        user.current_streak = (user.current_streak or 0) + 1
-    else:
-        streak.modules_completed = (streak.modules_completed or 0) + 1
-        streak.points_earned = (streak.points_earned or 0) + points_earned
-
-    user.best_streak = max(user.best_streak or 0, user.current_streak or 0)
+    user = g.user
+    completion = UserCompletion(user_id=user.id, module_type='observation', content_id=content_id,
+                                score=int(accuracy), points_earned=points_earned, ai_pending=True)
+    db.session.add(completion)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # uq_completion: this practice was already completed
+        db.session.rollback()
+        return jsonify({'error': '🚫 You have already completed this observation practice! Try a different video.'}), 409
+    completion_id = completion.id
+
+    # points and streak
+    award_progress(user, points_earned)
     db.session.commit()
+    _AI_REFINE_EXECUTOR.submit(refine_completion, completion_id, session['user_id'], user_answer,
+                               'observation', rescore, date.today())
 
-    success_data = {'points': points_earned, 'accuracy': accuracy, 'celebration': accuracy == 100}
+    success_data = {'points': points_earned, 'accuracy': accuracy, 'celebration': accuracy == 100,
+                    'completion_id': completion_id,
+                    'feedback_url': url_for('completion_feedback', completion_id=completion_id)}
     return jsonify(success_data)
 
 # -------------------------
@@ -903,10 +1480,17 @@ def admin_dashboard():
     if 'admin_id' not in session:
         return redirect(url_for('admin_login'))
 
-    total_users = db.session.query(func.count(User.id)).scalar() or 0
-    total_completions = db.session.query(func.count(UserCompletion.id)).scalar() or 0
-    today = date.today()
-    today_activities = db.session.query(func.count(UserCompletion.id)).filter(func.date(UserCompletion.completed_at) == today).scalar() or 0
+    # all three counters in one round-trip; today's count is a half-open range on
+    # completed_at (not DATE(completed_at)) so ix_uc_completed_at is usable
+    day_start = datetime.combine(date.today(), datetime.min.time())
+    total_users, total_completions, today_activities = db.session.execute(select(
+        select(func.count(User.id)).scalar_subquery(),
+        select(func.count(UserCompletion.id)).scalar_subquery(),
+        select(func.count(UserCompletion.id)).where(
+            UserCompletion.completed_at >= day_start,
+            UserCompletion.completed_at < day_start + timedelta(days=1)
+        ).scalar_subquery()
+    )).one()
 
     recent_activities = db.session.query(UserCompletion, User).join(User, UserCompletion.user_id == User.id).order_by(UserCompletion.completed_at.desc()).limit(10).all()
 
@@ -944,16 +1528,19 @@ def admin_add_listening():
         if not title or not transcript or not audio:
             flash('Title, audio file, and script are required')
         else:
-            ensure_upload_dir()
             name = secure_filename(audio.filename)
             ext = os.path.splitext(name)[1].lower()
             if ext not in ALLOWED_AUDIO_EXTS:
                 flash('Unsupported audio type. Allowed: mp3, wav, ogg, m4a, webm')
             else:
-                filename = f"{int(datetime.now().timestamp())}_{name}"
+                # content-hashed name: the file behind a URL never changes, so /uploads can cache it forever
+                digest = hashlib.file_digest(audio.stream, 'sha1').hexdigest()
+                filename = f"{digest[:16]}_{name}"
                 path = os.path.join(UPLOAD_DIR, filename)
-                audio.save(path)
-                item = ListeningContent(title=title, audio_file=filename, transcript=transcript, robot_character=robot_character, created_by=session['admin_id'])
+                if not os.path.exists(path):  # same bytes already uploaded
+                    save_upload(audio.stream, path)
+                item = ListeningContent(title=title, audio_file=filename, transcript=transcript, transcript_tokens=token_string(transcript),
+                                        robot_character=robot_character, created_by=session['admin_id'])
                 db.session.add(item)
                 db.session.commit()
                 flash('Listening content added')
@@ -972,7 +1559,8 @@ def admin_add_observation():
         if not title or not video_url or not questions or not correct_answers:
             flash('All fields are required')
         else:
-            item = ObservationContent(title=title, video_url=video_url, questions=questions, correct_answers=correct_answers, created_by=session['admin_id'])
+            item = ObservationContent(title=title, video_url=video_url, questions=questions, correct_answers=correct_answers,
+                                      correct_keywords=answer_keywords(correct_answers), created_by=session['admin_id'])
             db.session.add(item)
             db.session.commit()
             flash('Observation content added')
@@ -1017,15 +1605,22 @@ def admin_tts():
             flash('Please enter text to convert to audio.', 'error')
             return redirect(url_for('admin_tts'))
         try:
-            ensure_upload_dir()
-            ts = int(datetime.now().timestamp())
-            output_filename = f"tts_{ts}.mp3"
+            # content-addressed filename: the same text/lang/speed reuses the earlier mp3
+            key = hashlib.blake2b(f"{lang}|{int(slow)}|{text}".encode(), digest_size=16).hexdigest()
+            output_filename = f"tts_{key}.mp3"
             output_path = os.path.join(UPLOAD_DIR, output_filename)
-            tts = gTTS(text=text, lang=lang, slow=slow)
-            tts.save(output_path)
-            flash(f'Audio generated successfully: {output_filename}', 'success')
+            if os.path.exists(output_path):
+                flash(f'Audio reused from an earlier generation: {output_filename}', 'success')
+            else:
+                tts = gTTS(text=text, lang=lang, slow=slow)
+                # write aside and rename so a failed download never leaves a partial cache hit
+                tmp_path = output_path + '.part'
+                tts.save(tmp_path)
+                os.replace(tmp_path, output_path)
+                flash(f'Audio generated successfully: {output_filename}', 'success')
             if make_listening and title:
-                item = ListeningContent(title=title, audio_file=output_filename, transcript=text, robot_character=robot_character, created_by=session['admin_id'])
+                item = ListeningContent(title=title, audio_file=output_filename, transcript=text, transcript_tokens=token_string(text),
+                                        robot_character=robot_character, created_by=session['admin_id'])
                 db.session.add(item)
                 db.session.commit()
                 created_listening_id = item.id
@@ -1064,13 +1659,11 @@ def admin_tasks():
             flash('Task added successfully')
 
     tasks = Task.query.order_by(Task.created_at.desc()).limit(50).all()
-    biographies = Biography.query.with_entities(Biography.id, Biography.person_name, Biography.title).order_by(Biography.created_at.desc()).all()
-    listening_items = ListeningContent.query.with_entities(ListeningContent.id, ListeningContent.title).order_by(ListeningContent.created_at.desc()).all()
-    observation_items = ObservationContent.query.with_entities(ObservationContent.id, ObservationContent.title).order_by(ObservationContent.created_at.desc()).all()
-    writing_topics = WritingTopic.query.with_entities(WritingTopic.id, WritingTopic.topic).order_by(WritingTopic.created_at.desc()).all()
+    options = get_task_content_options()
 
-    return render_template('admin_tasks.html', tasks=tasks, biographies=biographies,
-                           listening_items=listening_items, observation_items=observation_items, writing_topics=writing_topics)
+    return render_template('admin_tasks.html', tasks=tasks, biographies=options['speaking'],
+                           listening_items=options['listening'], observation_items=options['observation'],
+                           writing_topics=options['writing'])
 
 @app.route('/admin/tasks/<int:task_id>/edit', methods=['GET', 'POST'])
 def admin_edit_task(task_id):
@@ -1109,21 +1702,26 @@ def admin_edit_task(task_id):
             flash('Task updated')
             return redirect(url_for('admin_tasks'))
 
-    biographies = Biography.query.with_entities(Biography.id, Biography.person_name, Biography.title).order_by(Biography.created_at.desc()).all()
-    listening_items = ListeningContent.query.with_entities(ListeningContent.id, ListeningContent.title).order_by(ListeningContent.created_at.desc()).all()
-    observation_items = ObservationContent.query.with_entities(ObservationContent.id, ObservationContent.title).order_by(ObservationContent.created_at.desc()).all()
-    writing_topics = WritingTopic.query.with_entities(WritingTopic.id, WritingTopic.topic).order_by(WritingTopic.created_at.desc()).all()
+    options = get_task_content_options()
 
-    return render_template('admin_task_edit.html', task=task, biographies=biographies,
-                           listening_items=listening_items, observation_items=observation_items, writing_topics=writing_topics)
+    return render_template('admin_task_edit.html', task=task, biographies=options['speaking'],
+                           listening_items=options['listening'], observation_items=options['observation'],
+                           writing_topics=options['writing'])
 
 @app.route('/admin/practices')
 def admin_manage_practices():
     if 'admin_id' not in session:
         return redirect(url_for('admin_login'))
-    speaking = Biography.query.order_by(Biography.created_at.desc()).all()
-    listening = ListeningContent.query.order_by(ListeningContent.created_at.desc()).all()
-    observation = ObservationContent.query.order_by(ObservationContent.created_at.desc()).all()
+    # only the table columns; biography text and transcripts stay in the database
+    speaking = Biography.query.options(load_only(
+        Biography.person_name, Biography.profession, Biography.created_at
+    )).order_by(Biography.created_at.desc()).all()
+    listening = ListeningContent.query.options(load_only(
+        ListeningContent.title, ListeningContent.audio_file, ListeningContent.robot_character
+    )).order_by(ListeningContent.created_at.desc()).all()
+    observation = ObservationContent.query.options(load_only(
+        ObservationContent.title, ObservationContent.video_url
+    )).order_by(ObservationContent.created_at.desc()).all()
     return render_template('admin_manage_practices.html', speaking=speaking, listening=listening, observation=observation)
 
 @app.route('/admin/speaking/<int:bio_id>/edit', methods=['GET', 'POST'])
@@ -1175,6 +1773,7 @@ def admin_edit_listening(content_id):
         item.title = title
         item.audio_file = audio_file
         item.transcript = transcript
+        item.transcript_tokens = token_string(transcript)
         item.robot_character = robot_character
         db.session.commit()
         flash('Listening content updated', 'success')
@@ -1209,6 +1808,7 @@ def admin_edit_observation(obs_id):
         item.video_url = video_url
         item.questions = questions
         item.correct_answers = correct_answers
+        item.correct_keywords = answer_keywords(correct_answers)
         db.session.commit()
         flash('Observation content updated', 'success')
         return redirect(url_for('admin_manage_practices'))
@@ -1234,7 +1834,7 @@ def leaderboard():
 def profile():
     if 'user_id' not in session:
         return redirect(url_for('index'))
-    user = User.query.get(session['user_id'])
+    user = g.user
     if request.method == 'POST':
         new_username = request.form.get('username', '').strip()
         new_department = request.form.get('department', '').strip()
@@ -1262,23 +1862,14 @@ def profile():
 def certificate_view():
     if 'user_id' not in session:
         return redirect(url_for('index'))
-    user = User.query.get(session['user_id'])
-    eligible = is_certificate_ready(session['user_id'])
+    user = g.user
+    eligible = is_certificate_ready(user)
     today_str = datetime.now().strftime('%Y-%m-%d')
     return render_template('certificate.html', user=user, eligible=eligible, reportlab=REPORTLAB_AVAILABLE, today=today_str)
 
-@app.route('/certificate/download')
-def certificate_download():
-    if 'user_id' not in session:
-        return redirect(url_for('index'))
-    if not is_certificate_ready(session['user_id']):
-        flash('Complete all modules (Speaking, Listening, Writing, Observation) to unlock your certificate.', 'warning')
-        return redirect(url_for('certificate_view'))
-    if not REPORTLAB_AVAILABLE:
-        flash('PDF generator is not installed on the server. Use the Print Certificate option.', 'warning')
-        return redirect(url_for('certificate_view'))
-
-    user = User.query.get(session['user_id'])
+@functools.lru_cache(maxsize=128)
+def render_certificate_pdf(username, department, today_str):
+    """Certificate PDF bytes, cached per (username, department, date)."""
     buf = io.BytesIO()
     c = canvas.Canvas(buf, pagesize=A4)
     width, height = A4
@@ -1287,20 +1878,47 @@ def certificate_download():
     c.setFont('Helvetica', 12)
     c.drawCentredString(width/2, height - 4*cm, 'Shakespeare Club - Communication Skills Program')
     c.setFont('Helvetica-Bold', 18)
-    c.drawCentredString(width/2, height - 7*cm, f"This certifies that {user.username}")
+    c.drawCentredString(width/2, height - 7*cm, f"This certifies that {username}")
     c.setFont('Helvetica', 12)
-    c.drawCentredString(width/2, height - 8*cm, f"Department: {user.department}")
+    c.drawCentredString(width/2, height - 8*cm, f"Department: {department}")
     c.drawCentredString(width/2, height - 10*cm, 'has successfully completed all practice modules:')
     c.drawCentredString(width/2, height - 11*cm, 'Speaking, Listening, Writing, and Observation')
-    today_str = datetime.now().strftime('%Y-%m-%d')
     c.drawCentredString(width/2, 3*cm, f"Date: {today_str}")
     c.setFont('Helvetica-Oblique', 10)
     c.drawRightString(width - 2*cm, 2*cm, 'Shakespeare Club')
     c.showPage()
     c.save()
-    buf.seek(0)
+    return buf.getvalue()
+
+@app.route('/certificate/download')
+def certificate_download():
+    if 'user_id' not in session:
+        return redirect(url_for('index'))
+    user = g.user
+    if not is_certificate_ready(user):
+        flash('Complete all modules (Speaking, Listening, Writing, Observation) to unlock your certificate.', 'warning')
+        return redirect(url_for('certificate_view'))
+    if not REPORTLAB_AVAILABLE:
+        flash('PDF generator is not installed on the server. Use the Print Certificate option.', 'warning')
+        return redirect(url_for('certificate_view'))
+
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    pdf_bytes = render_certificate_pdf(user.username, user.department, today_str)
+    # the document only depends on these fields, so a repeat download the same day revalidates to 304
+    etag = hashlib.blake2b(f"{user.id}|{user.username}|{user.department}|{today_str}".encode(),
+                           digest_size=16).hexdigest()
     filename = f"Certificate_{user.username}.pdf"
-    return send_file(buf, as_attachment=True, download_name=filename, mimetype='application/pdf')
+    return send_file(io.BytesIO(pdf_bytes), as_attachment=True, download_name=filename,
+                     mimetype='application/pdf', etag=etag, conditional=True)
+
+@app.route('/uploads/<path:filename>')
+def uploaded_audio(filename):
+    """Uploaded and generated audio. Filenames are content-hashed (or timestamped for
+    older uploads) and never rewritten, so browsers may cache them for a year."""
+    response = send_from_directory(UPLOAD_DIR, filename, conditional=True, max_age=UPLOAD_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
 @app.after_request
 def add_mic_permissions_headers(response):
@@ -1320,6 +1938,6 @@ def logout():
 if __name__ == '__main__':
     # Create tables and sample data when starting locally or on server first time
     with app.app_context():
-        db.create_all()
-        ensure_sample_data()
+        init_database()
+    get_whisper_model()  # load before the first speaking submission; logs and falls back on failure
     app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), debug=True)
\ No newline at end of file
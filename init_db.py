@@ -1,5 +1,5 @@
-from app import db, app
+from app import app, init_database
 
 with app.app_context():
-    db.create_all()
+    init_database()
     print("✅ Database tables created successfully!")
\ No newline at end of file
@@ -307,6 +307,35 @@ function submitPracticeForm(form, moduleType) {
     }, 2000);
 }
 
+// Poll a background job URL until the server stops answering 202 (gives up after ~2 minutes)
+async function pollJobResult(url) {
+    for (let i = 0; i < 120; i++) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const resp = await fetch(url);
+        if (resp.status !== 202) {
+            return { resp, data: await resp.json() };
+        }
+    }
+    throw new Error('Timed out waiting for analysis');
+}
+
+// Show the refined score, points and feedback once Gemini has finished;
+// fall back to returning to the module page if the analysis never arrives
+async function showRefinedFeedback(feedbackUrl, moduleUrl) {
+    document.getElementById('feedbackRow').style.display = 'block';
+    try {
+        const { resp, data } = await pollJobResult(feedbackUrl);
+        if (!resp.ok) throw new Error(data.error || 'Feedback unavailable');
+        document.getElementById('feedbackScore').textContent = `${data.score}%`;
+        document.getElementById('feedbackPoints').textContent = data.points;
+        document.getElementById('feedbackText').textContent = data.feedback || '';
+        document.getElementById('feedbackStatus').style.display = 'none';
+        document.getElementById('feedbackResult').style.display = 'block';
+    } catch (e) {
+        setTimeout(() => { window.location.href = moduleUrl; }, 3000);
+    }
+}
+
 // Points animation
 function animatePointsGain(points, element) {
     const pointsElement = document.createElement('div');